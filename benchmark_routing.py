@@ -0,0 +1,57 @@
+"""Benchmark routing algorithms on random station/emergency pairs"""
+import sys
+import time
+import random
+import networkx as nx
+
+from map_generator import KHARKIV_CENTER
+from road_network import load_road_graph
+from speed_profiles import load_speed_profiles
+from pathfinding import find_nearest_node, time_dependent_shortest_path, bidirectional_astar_path
+
+
+def random_node_pairs(graph, count, offset=0.03, seed=0):
+    """Node pairs around the city centre, like generated emergencies"""
+    rng = random.Random(seed)
+    lat, lon = KHARKIV_CENTER
+    pairs = []
+    for _ in range(count):
+        points = [(lat + rng.uniform(-offset, offset), lon + rng.uniform(-offset, offset))
+                  for _ in range(2)]
+        pairs.append(tuple(find_nearest_node(graph, p_lat, p_lon) for p_lat, p_lon in points))
+    return pairs
+
+
+def time_queries(label, pairs, query):
+    """Run a query per pair and print mean time (ms)"""
+    start = time.perf_counter()
+    for source, target in pairs:
+        try:
+            query(source, target)
+        except nx.NetworkXNoPath:
+            pass
+    mean_ms = (time.perf_counter() - start) / len(pairs) * 1000
+    print(f"{label:<28} {mean_ms:8.2f} ms/query")
+    return mean_ms
+
+
+def main():
+    """Benchmark entry point"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    graph = load_road_graph()
+    profiles = load_speed_profiles(graph)
+    pairs = random_node_pairs(graph, count)
+
+    static_ms = time_queries("Static Dijkstra", pairs,
+                             lambda s, t: nx.shortest_path(graph, s, t, weight='length'))
+    astar_ms = time_queries("Bidirectional A*", pairs,
+                            lambda s, t: bidirectional_astar_path(graph, s, t, 'length'))
+    print(f"{'':<28} {astar_ms / static_ms:8.2f}x static")
+    for label, departure in [("Time-dependent 03:00", 3 * 60), ("Time-dependent 08:00", 8 * 60)]:
+        td_ms = time_queries(label, pairs,
+                             lambda s, t: time_dependent_shortest_path(graph, s, t, profiles, departure))
+        print(f"{'':<28} {td_ms / static_ms:8.2f}x static")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,132 +2,184 @@
 import sys
 import os
 import random
+import socket
+from datetime import datetime
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QScrollArea, QLabel, QFrame, QPushButton
+    QLabel, QFrame, QPushButton, QListView, QAbstractItemView,
+    QStyledItemDelegate, QStyle, QComboBox
 )
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEngineSettings
-from PyQt6.QtCore import QUrl, Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import QUrl, Qt, QAbstractListModel, QModelIndex, QSize, QRectF
+from PyQt6.QtGui import QFont, QFontMetrics, QColor, QPen, QPainter
 
 from map_generator import (
     create_base_map, add_emergency_to_map, add_blocked_roads_to_map,
-    add_impact_zones_to_map, add_route_to_map, KHARKIV_CENTER
+    add_impact_zones_to_map, add_route_to_map, KHARKIV_CENTER, STATIONS
 )
-from road_network import load_road_graph, get_edge_geometry, get_major_road_edges
+from road_network import (
+    load_road_graph, get_edge_geometry, get_route_geometry, get_major_road_edges, random_impacts, damage_roads
+)
+from speed_profiles import load_speed_profiles
 from pathfinding import find_routes
+from routing_client import connect_routing_service, RoutingError
 
+# Route search modes: (label, algorithm, uses time-of-day speeds)
+ROUTING_MODES = [
+    ("Traffic-aware (time of day)", 'dijkstra', True),
+    ("Dijkstra (static)", 'dijkstra', False),
+    ("Bidirectional A* (static)", 'bidirectional_astar', False),
+]
 
-class AmbulanceCard(QFrame):
-    """Clickable ambulance status card"""
-
-    def __init__(self, ambulance_id, station, status, is_selected=False, on_click=None):
-        super().__init__()
-        self.ambulance_id = ambulance_id
-        self.station = station
-        self.status = status
-        self.is_selected = is_selected
-        self.on_click = on_click
-        self._setup_ui()
 
-    def mousePressEvent(self, event):
-        if self.on_click:
-            self.on_click(self.ambulance_id, self.station)
-        super().mousePressEvent(event)
+class AmbulanceListModel(QAbstractListModel):
+    """Ambulance rows (id, station, status) with the selected ambulance"""
 
-    def update_selection_style(self):
-        border = "border: 2px solid #5865f2;" if self.is_selected else "border: 1px solid #1a1b1e;"
-        self.setStyleSheet(f"""
-            AmbulanceCard {{
-                background-color: #2b2d31; border-radius: 8px;
-                padding: 0px; margin: 4px; {border}
-            }}
-            AmbulanceCard:hover {{background-color: #313338;}}
-        """)
+    SelectedRole = Qt.ItemDataRole.UserRole + 1
 
-    def _setup_ui(self):
-        self.setFrameShape(QFrame.Shape.StyledPanel)
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.update_selection_style()
-
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(16, 12, 16, 12)
-        layout.setSpacing(8)
-
-        # Top row: ID and status
-        top_row = QHBoxLayout()
-        id_label = QLabel(f"Ambulance {self.ambulance_id}")
-        id_label.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
-        id_label.setStyleSheet("color: #f2f3f5;")
-        top_row.addWidget(id_label)
-        top_row.addStretch()
-        top_row.addWidget(self._create_status_badge())
-        layout.addLayout(top_row)
-
-        # Station label
-        station_label = QLabel(f"Station {self.station}")
-        station_label.setFont(QFont("Segoe UI", 9))
-        station_label.setStyleSheet("color: #949ba4;")
-        layout.addWidget(station_label)
-
-    def _create_status_badge(self):
-        """Create status indicator badge"""
-        colors = {"Available": ("#23a55a", "#1a3a2a"), "Busy": ("#f23f43", "#3a1a1a")}
-        fg, bg = colors.get(self.status, ("#f0b232", "#3a2f1a"))
-
-        container = QFrame()
-        container.setStyleSheet(f"QFrame {{background-color: {bg}; border-radius: 12px;}}")
-
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(8, 4, 8, 4)
-
-        dot = QLabel("●")
-        dot.setFont(QFont("Segoe UI", 10))
-        dot.setStyleSheet(f"color: {fg};")
-        layout.addWidget(dot)
-
-        text = QLabel(self.status)
-        text.setFont(QFont("Segoe UI", 9, QFont.Weight.Medium))
-        text.setStyleSheet(f"color: {fg};")
-        layout.addWidget(text)
-
-        return container
+    def __init__(self, ambulances):
+        super().__init__()
+        self._ambulances = ambulances
+        self._selected_row = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ambulances)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.UserRole:
+            return self._ambulances[index.row()]
+        if role == self.SelectedRole:
+            return index.row() == self._selected_row
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"Ambulance {self._ambulances[index.row()][0]}"
+        return None
+
+    def set_selected_row(self, row):
+        """Select one row (or None), repainting only the rows that changed"""
+        changed = {self._selected_row, row} - {None}
+        self._selected_row = row
+        for r in changed:
+            self.dataChanged.emit(self.index(r), self.index(r), [self.SelectedRole])
+
+
+class AmbulanceCardDelegate(QStyledItemDelegate):
+    """Paints ambulance status cards without per-row widgets"""
+
+    STATUS_COLORS = {"Available": ("#23a55a", "#1a3a2a"), "Busy": ("#f23f43", "#3a1a1a")}
+    CARD_HEIGHT = 72
+    MARGIN = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.id_font = QFont("Segoe UI", 11, QFont.Weight.Bold)
+        self.station_font = QFont("Segoe UI", 9)
+        self.badge_font = QFont("Segoe UI", 9, QFont.Weight.Medium)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT + 2 * self.MARGIN)
+
+    def paint(self, painter, option, index):
+        ambulance_id, station, status = index.data(Qt.ItemDataRole.UserRole)
+        selected = index.data(AmbulanceListModel.SelectedRole)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        rect = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Card background and selection border
+        border = QPen(QColor("#5865f2"), 2) if selected else QPen(QColor("#1a1b1e"), 1)
+        painter.setPen(border)
+        painter.setBrush(QColor("#313338" if hovered else "#2b2d31"))
+        painter.drawRoundedRect(QRectF(rect), 8, 8)
+
+        # ID and station labels
+        text_rect = rect.adjusted(16, 12, -16, -12)
+        painter.setFont(self.id_font)
+        painter.setPen(QColor("#f2f3f5"))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+                         f"Ambulance {ambulance_id}")
+        painter.setFont(self.station_font)
+        painter.setPen(QColor("#949ba4"))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom,
+                         f"Station {station}")
+
+        # Status badge
+        fg, bg = self.STATUS_COLORS.get(status, ("#f0b232", "#3a2f1a"))
+        badge_text = f"● {status}"
+        badge_width = QFontMetrics(self.badge_font).horizontalAdvance(badge_text) + 16
+        badge = QRectF(text_rect.right() - badge_width, text_rect.top() - 4, badge_width, 24)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(bg))
+        painter.drawRoundedRect(badge, 12, 12)
+        painter.setFont(self.badge_font)
+        painter.setPen(QColor(fg))
+        painter.drawText(badge, Qt.AlignmentFlag.AlignCenter, badge_text)
+
+        painter.restore()
 
 
 class RouteCard(QFrame):
-    """Clickable route option card"""
+    """Clickable route option card, reused across route updates"""
+
+    ACCENTS = {'fastest': ('#00c853', '#1a3a2a'), 'alternative': ('#ffa726', '#3a2f1a')}
+    STYLE = """
+        RouteCard {background-color: #2b2d31; border-radius: 8px; border: 1px solid #1a1b1e;}
+        RouteCard:hover {background-color: #313338;}
+        RouteCard[selected="true"][routeType="fastest"] {border: 2px solid #00c853;}
+        RouteCard[selected="true"][routeType="alternative"] {border: 2px solid #ffa726;}
+    """
 
-    def __init__(self, route_data, is_selected=False, on_click=None):
+    def __init__(self, on_click=None):
         super().__init__()
-        self.route_data = route_data
-        self.is_selected = is_selected
+        self.route_data = None
+        self.is_selected = False
         self.on_click = on_click
         self._setup_ui()
 
     def mousePressEvent(self, event):
-        if self.on_click:
+        if self.on_click and self.route_data:
             self.on_click(self.route_data)
         super().mousePressEvent(event)
 
-    def update_selection_style(self):
-        colors = {'fastest': '#00c853', 'alternative': '#ffa726'}
-        accent = colors.get(self.route_data['type'], '#00c853')
-        border = f"border: 2px solid {accent};" if self.is_selected else "border: 1px solid #1a1b1e;"
-        self.setStyleSheet(f"""
-            RouteCard {{
-                background-color: #2b2d31; border-radius: 8px; {border}
-            }}
-            RouteCard:hover {{background-color: #313338;}}
-        """)
+    def set_route(self, route_data, is_selected):
+        """Show a route; accent styles are only rebuilt when the route type changes"""
+        previous_type = self.route_data.type if self.route_data else None
+        self.route_data = route_data
+        self.name.setText(route_data.name)
+        self.time.setText(f"⏱ {route_data.time_min:.1f} min")
+        self.dist.setText(f"{route_data.distance_km:.2f} km")
+
+        if route_data.type != previous_type:
+            accent, bg_accent = self.ACCENTS.get(route_data.type, self.ACCENTS['fastest'])
+            self.setProperty("routeType", route_data.type)
+            self.indicator.setStyleSheet(f"background-color: {bg_accent}; border-radius: 10px; padding: 4px 10px;")
+            self.dot.setStyleSheet(f"color: {accent};")
+            self.is_selected = is_selected
+            self.setProperty("selected", is_selected)
+            self._repolish()
+        else:
+            self.set_selected(is_selected)
+
+    def set_selected(self, is_selected):
+        """Toggle the selection border via a dynamic property (no stylesheet re-parse)"""
+        if is_selected == self.is_selected:
+            return
+        self.is_selected = is_selected
+        self.setProperty("selected", is_selected)
+        self._repolish()
+
+    def _repolish(self):
+        self.style().unpolish(self)
+        self.style().polish(self)
 
     def _setup_ui(self):
         self.setFrameShape(QFrame.Shape.StyledPanel)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.update_selection_style()
-
-        colors = {'fastest': ('#00c853', '#1a3a2a'), 'alternative': ('#ffa726', '#3a2f1a')}
-        accent, bg_accent = colors.get(self.route_data['type'], ('#00c853', '#1a3a2a'))
+        self.setStyleSheet(self.STYLE)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(16, 12, 16, 12)
@@ -135,37 +187,36 @@ class RouteCard(QFrame):
 
         # Top row: name and indicator
         top_row = QHBoxLayout()
-        name = QLabel(self.route_data['name'])
-        name.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
-        name.setStyleSheet("color: #f2f3f5;")
-        top_row.addWidget(name)
+        self.name = QLabel()
+        self.name.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
+        self.name.setStyleSheet("color: #f2f3f5;")
+        top_row.addWidget(self.name)
         top_row.addStretch()
 
-        indicator = QFrame()
-        indicator.setStyleSheet(f"background-color: {bg_accent}; border-radius: 10px; padding: 4px 10px;")
-        ind_layout = QHBoxLayout(indicator)
+        self.indicator = QFrame()
+        ind_layout = QHBoxLayout(self.indicator)
         ind_layout.setContentsMargins(8, 4, 8, 4)
-        dot = QLabel("●")
-        dot.setFont(QFont("Segoe UI", 9))
-        dot.setStyleSheet(f"color: {accent};")
-        ind_layout.addWidget(dot)
-        top_row.addWidget(indicator)
+        self.dot = QLabel("●")
+        self.dot.setFont(QFont("Segoe UI", 9))
+        ind_layout.addWidget(self.dot)
+        top_row.addWidget(self.indicator)
         layout.addLayout(top_row)
 
         # Stats row
         stats = QHBoxLayout()
-        time = QLabel(f"⏱ {self.route_data['time_min']:.1f} min")
-        time.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
-        time.setStyleSheet("color: #ffffff;")
-        stats.addWidget(time)
-
-        stats.addWidget(QLabel("•") if True else None)
-        stats.itemAt(1).widget().setStyleSheet("color: #4e5058;")
-
-        dist = QLabel(f"{self.route_data['distance_km']:.2f} km")
-        dist.setFont(QFont("Segoe UI", 10, QFont.Weight.Medium))
-        dist.setStyleSheet("color: #b5bac1;")
-        stats.addWidget(dist)
+        self.time = QLabel()
+        self.time.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
+        self.time.setStyleSheet("color: #ffffff;")
+        stats.addWidget(self.time)
+
+        separator = QLabel("•")
+        separator.setStyleSheet("color: #4e5058;")
+        stats.addWidget(separator)
+
+        self.dist = QLabel()
+        self.dist.setFont(QFont("Segoe UI", 10, QFont.Weight.Medium))
+        self.dist.setStyleSheet("color: #b5bac1;")
+        stats.addWidget(self.dist)
         stats.addStretch()
         layout.addLayout(stats)
 
@@ -234,6 +285,18 @@ class AmbulanceApp(QMainWindow):
         layout.addWidget(self._create_button("Generate Emergency", "#5865f2", self.generate_emergency))
         layout.addWidget(self._create_button("Heavy Damage", "#ed4245", self.block_roads))
 
+        # Route search mode
+        self.routing_mode = QComboBox()
+        self.routing_mode.addItems([label for label, _, _ in ROUTING_MODES])
+        self.routing_mode.setFont(QFont("Segoe UI", 10))
+        self.routing_mode.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.routing_mode.setStyleSheet("""
+            QComboBox {background-color: #2b2d31; color: #f2f3f5; border: none; border-radius: 6px; padding: 8px 12px;}
+            QComboBox QAbstractItemView {background-color: #2b2d31; color: #f2f3f5; selection-background-color: #404249;}
+        """)
+        self.routing_mode.currentIndexChanged.connect(self._recalculate_routes)
+        layout.addWidget(self.routing_mode)
+
         # Routes section
         self.routes_section = QWidget()
         routes_layout = QVBoxLayout(self.routes_section)
@@ -248,31 +311,49 @@ class AmbulanceApp(QMainWindow):
         self.routes_layout = QVBoxLayout(self.routes_container)
         self.routes_layout.setContentsMargins(0, 0, 0, 0)
         routes_layout.addWidget(self.routes_container)
+        self.route_cards = []
+        self.no_route_widget = self._create_no_route_widget()
+        self.routes_layout.addWidget(self.no_route_widget)
         self.routes_section.hide()
         layout.addWidget(self.routes_section)
 
-        # Ambulance cards scroll area
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setFrameShape(QFrame.Shape.NoFrame)
-        scroll.setStyleSheet("QScrollArea {background-color: transparent; border: none;}")
+        # Ambulance list (model/view, cards painted by delegate)
+        self.ambulance_model = AmbulanceListModel([(i, i, "Available") for i in range(1, 7)])
+        self.ambulance_view = QListView()
+        self.ambulance_view.setModel(self.ambulance_model)
+        self.ambulance_view.setItemDelegate(AmbulanceCardDelegate(self.ambulance_view))
+        self.ambulance_view.setUniformItemSizes(True)
+        self.ambulance_view.setMouseTracking(True)
+        self.ambulance_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.ambulance_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.ambulance_view.setFrameShape(QFrame.Shape.NoFrame)
+        self.ambulance_view.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.ambulance_view.setStyleSheet("QListView {background-color: transparent; border: none;}")
+        self.ambulance_view.clicked.connect(self._on_ambulance_clicked)
+        layout.addWidget(self.ambulance_view)
 
-        cards_container = QWidget()
-        cards_layout = QVBoxLayout(cards_container)
-        cards_layout.setContentsMargins(0, 0, 0, 0)
-        cards_layout.setSpacing(8)
+        return sidebar
 
-        self.ambulance_cards = []
-        for i in range(1, 7):
-            card = AmbulanceCard(i, i, "Available", on_click=self.select_ambulance)
-            cards_layout.addWidget(card)
-            self.ambulance_cards.append(card)
+    def _create_no_route_widget(self):
+        """Create hidden "no route" message shown when all roads are blocked"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
 
-        cards_layout.addStretch()
-        scroll.setWidget(cards_container)
-        layout.addWidget(scroll)
+        no_route = QLabel("⚠ No route available")
+        no_route.setFont(QFont("Segoe UI", 12, QFont.Weight.Bold))
+        no_route.setStyleSheet("color: #f23f43; padding: 16px; background-color: #2b2d31; border-radius: 8px;")
+        no_route.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(no_route)
 
-        return sidebar
+        help_text = QLabel("All roads are blocked.\nTry another ambulance.")
+        help_text.setFont(QFont("Segoe UI", 9))
+        help_text.setStyleSheet("color: #949ba4; padding: 8px;")
+        help_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(help_text)
+
+        widget.hide()
+        return widget
 
     def _create_button(self, text, color, callback):
         """Create styled action button"""
@@ -291,11 +372,14 @@ class AmbulanceApp(QMainWindow):
         return btn
 
     def _load_data(self):
-        """Load road graph and initialize state"""
+        """Connect to the routing service (or load the road graph) and initialize state"""
         try:
-            self.road_graph = load_road_graph()
-            self.major_road_edges = get_major_road_edges(self.road_graph)
-            print(f"Loaded: {len(self.road_graph.edges)} edges, {len(self.major_road_edges)} major roads")
+            self.road_graph = None
+            self.routing_client = connect_routing_service()
+            if self.routing_client:
+                print("Using running routing service, road graph stays in the service")
+            else:
+                self._load_road_graph()
 
             # Initialize state
             self.emergency_location = None
@@ -304,14 +388,7 @@ class AmbulanceApp(QMainWindow):
             self.impact_zones = []
             self.map_file = "map.html"
 
-            # Station positions
-            offset = 0.025
-            lat, lon = KHARKIV_CENTER
-            self.stations = [
-                (lat, lon, "Central"), (lat + offset, lon, "North"),
-                (lat - offset, lon, "South"), (lat, lon + offset, "East"),
-                (lat, lon - offset, "West"), (lat + offset/1.5, lon + offset/1.5, "Northeast")
-            ]
+            self.stations = STATIONS
 
             self.calculated_routes = []
             self.selected_ambulance_station = None
@@ -321,6 +398,28 @@ class AmbulanceApp(QMainWindow):
         except Exception as e:
             print(f"Error loading: {e}")
 
+    def _load_road_graph(self):
+        """Load the road graph, major roads and speed profiles for local routing (once)"""
+        if self.road_graph is not None:
+            return
+        self.road_graph = load_road_graph()
+        self.major_road_edges = get_major_road_edges(self.road_graph)
+        self.speed_profiles = load_speed_profiles(self.road_graph)
+        print(f"Loaded: {len(self.road_graph.edges)} edges, {len(self.major_road_edges)} major roads")
+
+    def _from_service(self, call):
+        """Run call(routing_client) on the routing service, or None to fall back to the local graph"""
+        if self.routing_client:
+            try:
+                return call(self.routing_client)
+            except (socket.timeout, RoutingError) as e:
+                print(f"Routing service failed ({e}), using local road graph")
+            except OSError as e:
+                print(f"Routing service unavailable ({e}), using local road graph")
+                self.routing_client = None
+        self._load_road_graph()
+        return None
+
     def _update_map(self):
         """Update map with current state"""
         m = create_base_map()
@@ -339,19 +438,14 @@ class AmbulanceApp(QMainWindow):
             return
 
         # Update selection state
-        for card in self.ambulance_cards:
-            card.is_selected = (card.ambulance_id == ambulance_id)
-            card.update_selection_style()
+        self.ambulance_model.set_selected_row(ambulance_id - 1)
 
         self.selected_ambulance_station = station_id
         station_lat, station_lon, _ = self.stations[station_id - 1]
 
         # Calculate routes
         try:
-            self.calculated_routes = find_routes(
-                self.road_graph, station_lat, station_lon,
-                *self.emergency_location, self.blocked_edges
-            )
+            self.calculated_routes = self._find_routes(station_lat, station_lon)
             print(f"Found {len(self.calculated_routes)} routes for Ambulance {ambulance_id}")
         except Exception as e:
             print(f"Route error: {e}")
@@ -359,6 +453,29 @@ class AmbulanceApp(QMainWindow):
 
         self._populate_route_cards()
 
+    def _find_routes(self, station_lat, station_lon):
+        """Routes from a station to the emergency, via the routing service if running"""
+        _, algorithm, time_aware = ROUTING_MODES[self.routing_mode.currentIndex()]
+        departure_min = self._departure_min() if time_aware else None
+
+        routes = self._from_service(lambda client: client.find_routes(
+            station_lat, station_lon, *self.emergency_location,
+            self.blocked_edges, departure_min, algorithm
+        ))
+        if routes is not None:
+            return routes
+
+        return find_routes(
+            self.road_graph, station_lat, station_lon,
+            *self.emergency_location, self.blocked_edges,
+            self.speed_profiles if time_aware else None, departure_min, algorithm
+        )
+
+    def _departure_min(self):
+        """Current time as minutes since midnight"""
+        now = datetime.now()
+        return now.hour * 60 + now.minute + now.second / 60
+
     def generate_emergency(self):
         """Generate random emergency call"""
         offset = 0.03
@@ -369,9 +486,7 @@ class AmbulanceApp(QMainWindow):
         )
 
         # Reset selection
-        for card in self.ambulance_cards:
-            card.is_selected = False
-            card.update_selection_style()
+        self.ambulance_model.set_selected_row(None)
 
         self.selected_ambulance_station = None
         self.calculated_routes = []
@@ -379,35 +494,27 @@ class AmbulanceApp(QMainWindow):
         self._update_map()
         print(f"Emergency at: {self.emergency_location[0]:.4f}, {self.emergency_location[1]:.4f}")
 
-    def _populate_route_cards(self):
-        """Populate route options UI"""
-        # Clear existing cards
-        while self.routes_layout.count():
-            item = self.routes_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        if not self.calculated_routes:
-            # Show no route message
-            self.routes_section.show()
-            no_route = QLabel("⚠ No route available")
-            no_route.setFont(QFont("Segoe UI", 12, QFont.Weight.Bold))
-            no_route.setStyleSheet("color: #f23f43; padding: 16px; background-color: #2b2d31; border-radius: 8px;")
-            no_route.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.routes_layout.addWidget(no_route)
-
-            help_text = QLabel("All roads are blocked.\nTry another ambulance.")
-            help_text.setFont(QFont("Segoe UI", 9))
-            help_text.setStyleSheet("color: #949ba4; padding: 8px;")
-            help_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.routes_layout.addWidget(help_text)
-            return
+    def _on_ambulance_clicked(self, index):
+        """Forward ambulance list clicks to selection handler"""
+        ambulance_id, station, _ = index.data(Qt.ItemDataRole.UserRole)
+        self.select_ambulance(ambulance_id, station)
 
-        # Show route cards
+    def _populate_route_cards(self):
+        """Populate route options UI, reusing pooled route cards"""
         self.routes_section.show()
-        for route in self.calculated_routes:
-            card = RouteCard(route, route == self.calculated_routes[0], self.select_route)
+        self.no_route_widget.setVisible(not self.calculated_routes)
+
+        while len(self.route_cards) < len(self.calculated_routes):
+            card = RouteCard(self.select_route)
             self.routes_layout.addWidget(card)
+            self.route_cards.append(card)
+
+        for i, card in enumerate(self.route_cards):
+            if i < len(self.calculated_routes):
+                card.set_route(self.calculated_routes[i], i == 0)
+                card.show()
+            else:
+                card.hide()
 
         if self.calculated_routes:
             self.selected_route = self.calculated_routes[0]
@@ -416,11 +523,9 @@ class AmbulanceApp(QMainWindow):
     def select_route(self, route_data):
         """Handle route selection"""
         self.selected_route = route_data
-        for i in range(self.routes_layout.count()):
-            card = self.routes_layout.itemAt(i).widget()
-            if card:
-                card.is_selected = (card.route_data == route_data)
-                card.update_selection_style()
+        for card in self.route_cards:
+            if card.isVisible():
+                card.set_selected(card.route_data.key == route_data.key)
         self._update_map_with_route()
 
     def _update_map_with_route(self):
@@ -433,73 +538,38 @@ class AmbulanceApp(QMainWindow):
         if self.emergency_location:
             add_emergency_to_map(m, *self.emergency_location)
         if self.selected_route:
-            add_route_to_map(m, self.road_graph, self.selected_route['path'],
-                           self.selected_route['color'], 6, 0.8, self.selected_route)
+            path = self.selected_route.path
+            coords = self._from_service(lambda client: client.route_geometry([path])[0])
+            if coords is None:
+                coords = get_route_geometry(self.road_graph, path)
+            add_route_to_map(m, coords, self.selected_route.color, 6, 0.8, self.selected_route)
         m.save(self.map_file)
         self.web_view.setUrl(QUrl.fromLocalFile(os.path.abspath(self.map_file)))
 
     def block_roads(self):
         """Simulate road damage from impacts"""
-        if not self.major_road_edges:
-            return
-
-        # Generate random impact points
-        num_impacts = random.randint(3, 5)
-        lat, lon = KHARKIV_CENTER
-        radius = 0.02
-        impacts = [(lat + random.uniform(-radius, radius),
-                   lon + random.uniform(-radius, radius))
-                  for _ in range(num_impacts)]
-
-        self.blocked_edges = []
-        self.blocked_edges_coords = []
-        self.impact_zones = []
-
-        # Block roads near each impact
-        for impact_lat, impact_lon in impacts:
-            nearby = []
-            for edge in self.major_road_edges:
-                if edge in self.blocked_edges:
-                    continue
-
-                u, v, key = edge
-                mid_lat = (self.road_graph.nodes[u]['y'] + self.road_graph.nodes[v]['y']) / 2
-                mid_lon = (self.road_graph.nodes[u]['x'] + self.road_graph.nodes[v]['x']) / 2
-                dist = ((mid_lat - impact_lat)**2 + (mid_lon - impact_lon)**2)**0.5
-
-                if dist <= 0.008:
-                    nearby.append((edge, dist))
-
-            nearby.sort(key=lambda x: x[1])
-            blocked_count = 0
-
-            for edge, _ in nearby[:random.randint(2, 4)]:
-                u, v, key = edge
-
-                # Block forward direction
-                if edge not in self.blocked_edges:
-                    self.blocked_edges.append(edge)
-                    self.blocked_edges_coords.append(get_edge_geometry(self.road_graph, edge))
-                    blocked_count += 1
-
-                # Block reverse direction (whole road destroyed)
-                reverse_edge = (v, u, key)
-                if self.road_graph.has_edge(v, u, key) and reverse_edge not in self.blocked_edges:
-                    self.blocked_edges.append(reverse_edge)
-                    blocked_count += 1
-
-            self.impact_zones.append({'lat': impact_lat, 'lon': impact_lon, 'roads_damaged': blocked_count})
+        # Generate random impact points and block roads near each
+        impacts = random_impacts(*KHARKIV_CENTER)
+        damage = self._from_service(lambda client: client.damage_roads(impacts))
+        if damage is not None:
+            self.blocked_edges, self.blocked_edges_coords, self.impact_zones = damage
+        else:
+            if not self.major_road_edges:
+                return
+            self.blocked_edges, damaged_roads, self.impact_zones = damage_roads(
+                self.road_graph, self.major_road_edges, impacts
+            )
+            self.blocked_edges_coords = [get_edge_geometry(self.road_graph, edge) for edge in damaged_roads]
 
-        print(f"{num_impacts} impacts, {len(self.blocked_edges)} roads blocked")
+        print(f"{len(impacts)} impacts, {len(self.blocked_edges)} roads blocked")
+        self._recalculate_routes()
 
-        # Recalculate routes if needed
+    def _recalculate_routes(self):
+        """Recalculate routes for the selected ambulance, or just redraw the map"""
         if self.emergency_location and self.selected_ambulance_station:
             station_lat, station_lon, _ = self.stations[self.selected_ambulance_station - 1]
             try:
-                self.calculated_routes = find_routes(
-                    self.road_graph, station_lat, station_lon,
-                    *self.emergency_location, self.blocked_edges
-                )
+                self.calculated_routes = self._find_routes(station_lat, station_lon)
             except:
                 self.calculated_routes = []
             self._populate_route_cards()
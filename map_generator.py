@@ -1,8 +1,20 @@
 """Folium map generation with stations, emergencies, and routes"""
 import folium
+from folium.plugins import HeatMap
 
 KHARKIV_CENTER = (49.9808, 36.2527)
 
+# Station positions (lat, lon, name) around the city center
+_STATION_OFFSET = 0.025
+STATIONS = [
+    (KHARKIV_CENTER[0], KHARKIV_CENTER[1], "Central"),
+    (KHARKIV_CENTER[0] + _STATION_OFFSET, KHARKIV_CENTER[1], "North"),
+    (KHARKIV_CENTER[0] - _STATION_OFFSET, KHARKIV_CENTER[1], "South"),
+    (KHARKIV_CENTER[0], KHARKIV_CENTER[1] + _STATION_OFFSET, "East"),
+    (KHARKIV_CENTER[0], KHARKIV_CENTER[1] - _STATION_OFFSET, "West"),
+    (KHARKIV_CENTER[0] + _STATION_OFFSET/1.5, KHARKIV_CENTER[1] + _STATION_OFFSET/1.5, "Northeast")
+]
+
 
 def create_base_map():
     """Create map with 6 ambulance stations"""
@@ -17,18 +29,9 @@ def create_base_map():
     m.fit_bounds([[49.93, 36.15], [50.03, 36.35]])
 
     # Add 6 stations with ambulances
-    offset = 0.025
-    lat, lon = KHARKIV_CENTER
-    stations = [
-        (lat, lon, "Central Station"),
-        (lat + offset, lon, "North Station"),
-        (lat - offset, lon, "South Station"),
-        (lat, lon + offset, "East Station"),
-        (lat, lon - offset, "West Station"),
-        (lat + offset/1.5, lon + offset/1.5, "Northeast Station")
-    ]
-
-    for i, (lat, lon, name) in enumerate(stations, 1):
+    for i, (lat, lon, station_name) in enumerate(STATIONS, 1):
+        name = f"{station_name} Station"
+
         # Station marker
         folium.Marker(
             [lat, lon], popup=name, tooltip=name,
@@ -70,6 +73,12 @@ def add_impact_zones_to_map(base_map, impact_zones):
     pass
 
 
+def add_resilience_heat_to_map(base_map, heat_points):
+    """Add heat overlay of (lat, lon, weight) points, e.g. closure impact per road"""
+    if heat_points:
+        HeatMap(heat_points, name='Closure impact', radius=18, blur=14, min_opacity=0.3).add_to(base_map)
+
+
 def add_blocked_roads_to_map(base_map, blocked_edges_coords):
     """Add blocked road segments as red dashed lines"""
     for coords in blocked_edges_coords:
@@ -79,30 +88,13 @@ def add_blocked_roads_to_map(base_map, blocked_edges_coords):
         ).add_to(base_map)
 
 
-def add_route_to_map(base_map, graph, route_path, color, weight=5, opacity=0.7, route_info=None):
-    """Add route path using actual road geometry"""
-    coords = []
-
-    for i in range(len(route_path) - 1):
-        u, v = route_path[i], route_path[i + 1]
-
-        if graph.has_edge(u, v):
-            edge_data = graph[u][v]
-            edge_key = list(edge_data.keys())[0]
-            edge_info = edge_data[edge_key]
-
-            if 'geometry' in edge_info:
-                coords.extend([(p[1], p[0]) for p in edge_info['geometry'].coords])
-            else:
-                if not coords or coords[-1] != [graph.nodes[u]['y'], graph.nodes[u]['x']]:
-                    coords.append([graph.nodes[u]['y'], graph.nodes[u]['x']])
-                coords.append([graph.nodes[v]['y'], graph.nodes[v]['x']])
-
+def add_route_to_map(base_map, coords, color, weight=5, opacity=0.7, route_info=None):
+    """Add route path from its road geometry (see road_network.get_route_geometry)"""
     if coords:
         tooltip = popup = "Route"
         if route_info:
-            tooltip = f"{route_info['name']}: {route_info['time_min']:.1f} min, {route_info['distance_km']:.2f} km"
-            popup = f"<b>{route_info['name']}</b><br>Time: {route_info['time_min']:.1f} min<br>Distance: {route_info['distance_km']:.2f} km"
+            tooltip = f"{route_info.name}: {route_info.time_min:.1f} min, {route_info.distance_km:.2f} km"
+            popup = f"<b>{route_info.name}</b><br>Time: {route_info.time_min:.1f} min<br>Distance: {route_info.distance_km:.2f} km"
 
         folium.PolyLine(
             coords, color=color, weight=weight, opacity=opacity,
@@ -1,90 +1,440 @@
 """Ambulance pathfinding with blocked road avoidance"""
+import math
+import heapq
+from itertools import count
+from time import perf_counter
+import numpy as np
 import networkx as nx
 import osmnx as ox
+from sklearn.neighbors import BallTree
 
+from speed_profiles import static_speed_kmh, MAJOR_SPEED_KMH
+from route_model import RouteRecord
 
-def find_nearest_node(graph, lat, lon):
-    """Find nearest graph node to coordinates"""
+EARTH_RADIUS_M = 6371000
+ALGORITHMS = ['dijkstra', 'bidirectional_astar']
+
+
+class NearestNodeIndex:
+    """Haversine ball tree over a graph's nodes, built once for repeated lookups
+
+    ox.distance.nearest_nodes rebuilds an equivalent tree on every call; keep
+    one of these alongside a long-lived graph instead. Rebuild it if the
+    graph's nodes change.
+    """
+
+    def __init__(self, graph):
+        self.nodes = list(graph.nodes)
+        self.tree = BallTree(np.radians([[data['y'], data['x']] for _, data in graph.nodes(data=True)]),
+                             metric='haversine')
+
+    def nearest(self, lat, lon):
+        _, indices = self.tree.query(np.radians([[lat, lon]]), k=1)
+        return self.nodes[indices[0][0]]
+
+
+def find_nearest_node(graph, lat, lon, node_index=None):
+    """Find nearest graph node to coordinates, using a NearestNodeIndex if given"""
+    if node_index is not None:
+        return node_index.nearest(lat, lon)
     return ox.distance.nearest_nodes(graph, lon, lat)
 
 
-def calculate_route_metrics(graph, route):
-    """Calculate distance (km) and time (min) for a route"""
+def haversine_points(lat1, lon1, lat2, lon2):
+    """Great-circle distance (m) between two coordinates"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def haversine_m(graph, u, v):
+    """Great-circle distance (m) between two graph nodes"""
+    return haversine_points(graph.nodes[u]['y'], graph.nodes[u]['x'], graph.nodes[v]['y'], graph.nodes[v]['x'])
+
+
+def _edge_minutes(profiles, data, minute_of_day):
+    """Travel time (min) over an edge entered at a time of day"""
+    return data.get('length', 0) / 1000 / profiles.speed_kmh(data, minute_of_day) * 60
+
+
+def calculate_route_metrics(graph, route, profiles=None, departure_min=None, closed=None):
+    """Calculate distance (km) and time (min) for a route
+
+    With speed profiles and a departure time (minutes since midnight), each
+    edge is timed at the moment the ambulance reaches it. Edge directions in
+    `closed` are skipped when picking between parallel edges.
+    """
+    time_dependent = profiles is not None and departure_min is not None
+    closed = closed or ()
     distance_m = 0
-    time_hours = 0
+    time_min = 0
 
     for i in range(len(route) - 1):
-        edge_data = min(graph[route[i]][route[i + 1]].values(),
+        u, v = route[i], route[i + 1]
+        edges = [(key, data) for key, data in graph[u][v].items() if (u, v, key) not in closed]
+        if time_dependent:
+            edge_data = min((data for _, data in edges),
+                            key=lambda x: _edge_minutes(profiles, x, departure_min + time_min))
+            distance_m += edge_data.get('length', 0)
+            time_min += _edge_minutes(profiles, edge_data, departure_min + time_min)
+            continue
+
+        edge_data = min((data for _, data in edges),
                        key=lambda x: x.get('length', float('inf')))
         length = edge_data.get('length', 0)
         distance_m += length
+        time_min += (length / 1000) / static_speed_kmh(edge_data) * 60
 
-        # Speed: 80 km/h for highways, 60 km/h for others
-        highway = edge_data.get('highway', '')
-        speed = 80 if highway in ['motorway', 'trunk', 'primary'] else 60
-        time_hours += (length / 1000) / speed
+    return distance_m / 1000, time_min
 
-    return distance_m / 1000, time_hours * 60
 
+def time_dependent_shortest_path(graph, source, target, profiles, departure_min):
+    """Earliest-arrival A* path using time-of-day speed profiles
 
-def find_routes(graph, start_lat, start_lon, end_lat, end_lon, blocked_edges):
-    """Find fastest and alternative routes avoiding blocked edges"""
-    start_node = find_nearest_node(graph, start_lat, start_lon)
-    end_node = find_nearest_node(graph, end_lat, end_lon)
+    Edge costs depend on the arrival time at the edge tail, so labels are
+    arrival times rather than static weights. The heuristic is straight-line
+    distance at the fastest profiled speed, which keeps it admissible.
+    """
+    metres_per_min = profiles.max_speed_kmh() * 1000 / 60
+    tie = count()
+    arrival = {source: departure_min}
+    parent = {source: None}
+    settled = set()
+    heap = [(departure_min + haversine_m(graph, source, target) / metres_per_min, next(tie), source)]
+
+    while heap:
+        _, _, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        if u == target:
+            path = []
+            while u is not None:
+                path.append(u)
+                u = parent[u]
+            return path[::-1]
+        settled.add(u)
+
+        t_u = arrival[u]
+        for v, edges in graph[u].items():
+            if v in settled:
+                continue
+            t_v = t_u + min(_edge_minutes(profiles, data, t_u) for data in edges.values())
+            if t_v < arrival.get(v, float('inf')):
+                arrival[v] = t_v
+                parent[v] = u
+                heapq.heappush(heap, (t_v + haversine_m(graph, v, target) / metres_per_min, next(tie), v))
+
+    raise nx.NetworkXNoPath(f"No path between {source} and {target}")
+
+
+def _length_cost(data):
+    return data.get('length', 0)
+
+
+def _time_cost(data):
+    return data.get('length', 0) / 1000 / static_speed_kmh(data) * 60
+
+
+# weight -> (edge cost, heuristic cost per straight-line metre)
+_WEIGHTS = {
+    'length': (_length_cost, 1),
+    'time': (_time_cost, 60 / 1000 / MAJOR_SPEED_KMH),
+}
+
+
+def bidirectional_astar_path(graph, source, target, weight='length', closed=None, stats=None):
+    """Bidirectional A* path, a drop-in for nx.shortest_path on road graphs
+
+    `weight` is 'length' (m) or 'time' (min at free-flow speed); the heuristic
+    is haversine distance, divided by the top speed for 'time', so it never
+    overestimates. Both searches share the average potential
+    (h_target - h_source) / 2, which keeps reduced costs non-negative so
+    the usual bidirectional Dijkstra stopping rule stays exact. Edge
+    directions (u, v, key) in `closed` are treated as removed, so no graph
+    copy is needed. If a `stats` dict is given it receives the settled node
+    count, path cost and query time.
+    """
+    start_time = perf_counter()
+    edge_cost, scale = _WEIGHTS[weight]
+    closed = closed or ()
+
+    potentials = {}
+
+    def potential(v):
+        if v not in potentials:
+            potentials[v] = (haversine_m(graph, v, target) - haversine_m(graph, source, v)) * scale / 2
+        return potentials[v]
+
+    # Reduced key offsets so both searches start at key 0
+    key_offset = [-potential(source), potential(target)]
+    key_sign = [1, -1]
+    adjacency = [graph.succ, graph.pred]
+
+    tie = count()
+    dist = [{source: 0}, {target: 0}]
+    parent = [{source: None}, {target: None}]
+    settled = [set(), set()]
+    heaps = [[(0, next(tie), source)], [(0, next(tie), target)]]
+    best, meeting = (0, source) if source == target else (float('inf'), None)
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best + key_offset[0] + key_offset[1]:
+            break
+
+        # Expand the smaller frontier
+        d = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        _, _, u = heapq.heappop(heaps[d])
+        if u in settled[d]:
+            continue
+        settled[d].add(u)
+
+        for v, edges in adjacency[d][u].items():
+            tail, head = (u, v) if d == 0 else (v, u)
+            costs = [edge_cost(data) for key, data in edges.items() if (tail, head, key) not in closed]
+            if not costs:
+                continue
 
-    # Remove blocked edges in both directions
-    graph_clean = graph.copy()
-    removed = 0
+            g = dist[d][u] + min(costs)
+            if g < dist[d].get(v, float('inf')):
+                dist[d][v] = g
+                parent[d][v] = u
+                heapq.heappush(heaps[d], (g + key_sign[d] * potential(v) + key_offset[d], next(tie), v))
+                if v in dist[1 - d] and g + dist[1 - d][v] < best:
+                    best, meeting = g + dist[1 - d][v], v
+
+    if stats is not None:
+        stats.update(settled=len(settled[0]) + len(settled[1]), cost=best,
+                     time_ms=(perf_counter() - start_time) * 1000)
+    if meeting is None:
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}")
+
+    path = []
+    node = meeting
+    while node is not None:
+        path.append(node)
+        node = parent[0][node]
+    path.reverse()
+    node = parent[1][meeting]
+    while node is not None:
+        path.append(node)
+        node = parent[1][node]
+    return path
+
+
+def _shortest_path(graph, source, target, profiles, departure_min, algorithm='dijkstra', closed=None,
+                   stats=None):
+    if algorithm == 'bidirectional_astar':
+        return bidirectional_astar_path(graph, source, target, 'length', closed, stats)
+
+    start_time = perf_counter()
+    view = nx.restricted_view(graph, [], closed) if closed else graph
+    if profiles is not None and departure_min is not None:
+        path = time_dependent_shortest_path(view, source, target, profiles, departure_min)
+    else:
+        path = nx.shortest_path(view, source, target, weight='length')
+    if stats is not None:
+        stats.update(time_ms=(perf_counter() - start_time) * 1000)
+    return path
+
+
+def find_routes(graph, start_lat, start_lon, end_lat, end_lon, blocked_edges,
+                profiles=None, departure_min=None, algorithm='dijkstra', stats=None, node_index=None):
+    """Find fastest and alternative routes avoiding blocked edges
+
+    Passing speed profiles and a departure time (minutes since midnight)
+    switches to time-dependent routing and ETAs. `algorithm` picks the
+    static search (one of ALGORITHMS); 'bidirectional_astar' only supports
+    static speeds, so combining it with a departure time raises ValueError.
+    Blocked edges are hidden through a graph view or mask; the graph itself
+    is never copied. If a `stats` dict is given it receives the algorithm
+    and query time of the fastest route search (plus settled nodes and
+    cost for bidirectional A*). `node_index` (a NearestNodeIndex of the
+    graph) speeds up snapping the endpoints to nodes.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown routing algorithm: {algorithm} (expected one of {ALGORITHMS})")
+    if algorithm == 'bidirectional_astar' and profiles is not None and departure_min is not None:
+        raise ValueError("bidirectional_astar uses static speeds and cannot route by departure time")
+
+    start_node = find_nearest_node(graph, start_lat, start_lon, node_index)
+    end_node = find_nearest_node(graph, end_lat, end_lon, node_index)
+
+    # Close blocked edges in both directions
+    closed = set()
     for u, v, key in blocked_edges:
-        if graph_clean.has_edge(u, v, key):
-            graph_clean.remove_edge(u, v, key)
-            removed += 1
-        if graph_clean.has_edge(v, u, key):
-            graph_clean.remove_edge(v, u, key)
-            removed += 1
+        for edge in ((u, v, key), (v, u, key)):
+            if graph.has_edge(*edge):
+                closed.add(edge)
 
-    print(f"Removed {removed} edge directions from graph ({len(blocked_edges)} blocked roads)")
+    print(f"Removed {len(closed)} edge directions from graph ({len(blocked_edges)} blocked roads)")
 
     # Find fastest route
     try:
-        path = nx.shortest_path(graph_clean, start_node, end_node, weight='length')
-        distance, time = calculate_route_metrics(graph_clean, path)
-        routes = [{
-            'name': 'Fastest Route',
-            'path': path,
-            'distance_km': distance,
-            'time_min': time,
-            'color': '#00c853',
-            'type': 'fastest'
-        }]
+        if stats is not None:
+            stats['algorithm'] = algorithm
+        path = _shortest_path(graph, start_node, end_node, profiles, departure_min, algorithm, closed, stats)
+        distance, time = calculate_route_metrics(graph, path, profiles, departure_min, closed)
+        routes = [RouteRecord('Fastest Route', path, distance, time, '#00c853', 'fastest')]
     except nx.NetworkXNoPath:
         print("No path found - all routes blocked!")
         return []
 
-    # Find alternative route (remove middle section of fastest path)
+    # Find alternative route (close middle section of fastest path)
     if len(path) > 10:
-        graph_alt = graph_clean.copy()
+        closed_alt = set(closed)
         mid_start, mid_end = len(path) // 3, 2 * len(path) // 3
 
         for i in range(mid_start, min(mid_end, len(path) - 1)):
             u, v = path[i], path[i + 1]
-            if graph_alt.has_edge(u, v):
-                for key in list(graph_alt[u][v].keys()):
-                    graph_alt.remove_edge(u, v, key)
+            closed_alt.update((u, v, key) for key in graph[u][v])
 
         try:
-            alt_path = nx.shortest_path(graph_alt, start_node, end_node, weight='length')
+            alt_path = _shortest_path(graph, start_node, end_node, profiles, departure_min,
+                                      algorithm, closed_alt)
             if alt_path != path:
-                distance, time = calculate_route_metrics(graph_clean, alt_path)
-                routes.append({
-                    'name': 'Alternative Route',
-                    'path': alt_path,
-                    'distance_km': distance,
-                    'time_min': time,
-                    'color': '#ffa726',
-                    'type': 'alternative'
-                })
+                distance, time = calculate_route_metrics(graph, alt_path, profiles, departure_min, closed)
+                routes.append(RouteRecord('Alternative Route', alt_path, distance, time,
+                                          '#ffa726', 'alternative'))
         except nx.NetworkXNoPath:
             pass
 
     return routes
+
+
+def _sharded_search(sharded_graph, source, target, closed):
+    """Length A* over a sharded graph, loading each node's shard as it is expanded
+
+    Labels and coordinates are kept outside the resident graph, so shards with
+    no open nodes left (behind the search) are marked cold and evicted first,
+    and the search never needs more than `max_loaded` shards at once. Returns
+    the path, the data of each edge on it and the coordinates of its nodes.
+    """
+    graph = sharded_graph.graph
+    target_lat, target_lon = graph.nodes[target]['y'], graph.nodes[target]['x']
+    coords = {source: (graph.nodes[source]['y'], graph.nodes[source]['x'])}
+    tile = {source: sharded_graph.tile_for_point(*coords[source])}
+    open_nodes = {tile[source]: 1}
+    tie = count()
+    dist = {source: 0}
+    parent = {source: None}
+    settled = set()
+    heap = [(haversine_points(*coords[source], target_lat, target_lon), next(tie), source)]
+
+    while heap:
+        _, _, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        if u == target:
+            break
+        settled.add(u)
+        open_nodes[tile[u]] -= 1
+        sharded_graph.load_shards([tile[u]])
+
+        for v, edges in graph.succ[u].items():
+            options = [(data.get('length', 0), key, data) for key, data in edges.items()
+                       if (u, v, key) not in closed]
+            if not options or v in settled:
+                continue
+            length, key, data = min(options, key=lambda option: option[0])
+            g = dist[u] + length
+            if g < dist.get(v, float('inf')):
+                if v not in dist:
+                    coords[v] = (graph.nodes[v]['y'], graph.nodes[v]['x'])
+                    tile[v] = sharded_graph.tile_for_point(*coords[v])
+                    open_nodes[tile[v]] = open_nodes.get(tile[v], 0) + 1
+                dist[v] = g
+                parent[v] = (u, key, data)
+                heapq.heappush(heap, (g + haversine_points(*coords[v], target_lat, target_lon), next(tie), v))
+
+        if not open_nodes[tile[u]]:
+            sharded_graph.mark_cold([tile[u]])
+    else:
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}")
+
+    path, edges = [target], []
+    while parent[path[-1]] is not None:
+        u, key, data = parent[path[-1]]
+        edges.append((u, path[-1], key, data))
+        path.append(u)
+    path.reverse()
+    edges.reverse()
+    return path, edges, {node: coords[node] for node in path}
+
+
+def _route_graph(path_edges, path_coords, graph_attrs):
+    """Minimal graph holding just one route's nodes and edges, for metrics and drawing"""
+    route_graph = nx.MultiDiGraph(**graph_attrs)
+    for node, (lat, lon) in path_coords.items():
+        route_graph.add_node(node, y=lat, x=lon)
+    for u, v, key, data in path_edges:
+        route_graph.add_edge(u, v, key, **data)
+    return route_graph
+
+
+def find_routes_sharded(sharded_graph, start_lat, start_lon, end_lat, end_lon, blocked_edges,
+                        algorithm='dijkstra'):
+    """Find routes on a sharded graph, loading only shards the search reaches
+
+    A length A* search loads the shard of each node it expands and evicts
+    shards it has left behind, so routes of any length stay within the
+    graph's `max_loaded` limit. If the shards along the route fit in that
+    limit they are loaded together and routed with find_routes (fastest and
+    alternative route); otherwise only the search's shortest route is
+    returned, on a small graph holding just that route. Returns
+    (routes, graph) so the caller can draw the routes; the resident graph
+    changes on later queries. Speed profiles are built per graph, so
+    sharded routing uses static speeds.
+    """
+    keys = sharded_graph.shards_for_points([(start_lat, start_lon), (end_lat, end_lon)])
+    if not keys:
+        print("Start and end are outside the sharded region")
+        return [], None
+    try:
+        graph = sharded_graph.load_shards(keys)
+    except ValueError as e:
+        print(f"Cannot load shards around start and end: {e}")
+        return [], None
+
+    start_node = find_nearest_node(graph, start_lat, start_lon)
+    end_node = find_nearest_node(graph, end_lat, end_lon)
+    closed = {edge for u, v, key in blocked_edges for edge in ((u, v, key), (v, u, key))}
+    try:
+        path, path_edges, path_coords = _sharded_search(sharded_graph, start_node, end_node, closed)
+    except nx.NetworkXNoPath:
+        print("No path found - all routes blocked!")
+        return [], graph
+
+    corridor = keys | {sharded_graph.tile_for_point(lat, lon) for lat, lon in path_coords.values()}
+    if len(corridor) <= sharded_graph.max_loaded:
+        print(f"Routing over {len(corridor)} shards")
+        graph = sharded_graph.load_shards(corridor)
+        return find_routes(graph, start_lat, start_lon, end_lat, end_lon, blocked_edges,
+                           algorithm=algorithm), graph
+
+    print(f"Route crosses {len(corridor)} shards (at most {sharded_graph.max_loaded} loaded), "
+          f"returning the shortest route only")
+    route_graph = _route_graph(path_edges, path_coords, graph.graph)
+    distance, time = calculate_route_metrics(route_graph, path)
+    return [RouteRecord('Fastest Route', path, distance, time, '#00c853', 'fastest')], route_graph
+
+
+def rank_stations(graph, stations, lat, lon, blocked_edges, profiles=None, departure_min=None,
+                  algorithm='dijkstra', node_index=None):
+    """Rank (lat, lon, name) stations by fastest route time to a location
+
+    Stations with no route are left out of the ranking.
+    """
+    ranking = []
+    for station_id, (station_lat, station_lon, name) in enumerate(stations, 1):
+        routes = find_routes(graph, station_lat, station_lon, lat, lon, blocked_edges,
+                             profiles, departure_min, algorithm, node_index=node_index)
+        if routes:
+            ranking.append({
+                'station': station_id,
+                'name': name,
+                'distance_km': routes[0].distance_km,
+                'time_min': routes[0].time_min
+            })
+
+    return sorted(ranking, key=lambda r: r['time_min'])
@@ -0,0 +1,212 @@
+"""Batch what-if analysis of network resilience to road closures
+
+Each damage pattern (a set of blocked edge directions) is evaluated for all
+stations at once: one travel-time search per station gives the covered area
+and ETAs to every demand point, instead of one route query per point.
+Patterns run in parallel across a process pool.
+"""
+import os
+import sys
+import csv
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import networkx as nx
+
+from map_generator import KHARKIV_CENTER, STATIONS, create_base_map, add_resilience_heat_to_map
+from road_network import load_road_graph, get_major_road_edges, random_impacts, damage_roads
+from speed_profiles import static_speed_kmh
+from pathfinding import find_nearest_node
+
+COVERAGE_MIN = 10          # Target response time for coverage
+DEMAND_POINTS = 300        # Sampled nodes used for ETA degradation
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+# Worker process state (inherited on fork, pickled once per worker otherwise)
+_graph = None
+_context = None
+
+
+def travel_minutes(edge_data):
+    """Free-flow travel time (min) over an edge"""
+    return edge_data.get('length', 0) / 1000 / static_speed_kmh(edge_data) * 60
+
+
+def road_key(edge):
+    """Direction-independent key for a road (u, v, key)"""
+    u, v, key = edge
+    return (u, v, key) if u <= v else (v, u, key)
+
+
+def random_damage_patterns(graph, major_edges, count, seed=None):
+    """Damage patterns from random impacts, as in the app's "Heavy Damage" action"""
+    rng = random.Random(seed)
+    patterns = []
+    for _ in range(count):
+        blocked_edges, _, _ = damage_roads(graph, major_edges, random_impacts(*KHARKIV_CENTER, rng=rng), rng)
+        patterns.append(blocked_edges)
+    return patterns
+
+
+def single_closure_patterns(graph, edges):
+    """One pattern per road, closing it in both directions"""
+    patterns = {}
+    for u, v, key in edges:
+        if road_key((u, v, key)) not in patterns:
+            pattern = [(u, v, key)]
+            if graph.has_edge(v, u, key):
+                pattern.append((v, u, key))
+            patterns[road_key((u, v, key))] = pattern
+    return list(patterns.values())
+
+
+def _travel_weight(blocked):
+    """Dijkstra weight hiding blocked edges (None means no edge)"""
+    def weight(u, v, edges):
+        times = [travel_minutes(data) for key, data in edges.items() if (u, v, key) not in blocked]
+        return min(times) if times else None
+    return weight
+
+
+def _station_search(graph, source, blocked, demand_nodes, coverage_min):
+    """Covered node count and ETAs (None if unreachable) from one station"""
+    times = nx.single_source_dijkstra_path_length(graph, source, weight=_travel_weight(blocked))
+    covered = sum(1 for t in times.values() if t <= coverage_min)
+    return covered, [times.get(node) for node in demand_nodes]
+
+
+def _init_worker(graph, context):
+    global _graph, _context
+    _graph, _context = graph, context
+
+
+def _analyze_pattern(task):
+    """Per-station coverage and ETA degradation for one damage pattern"""
+    pattern_id, blocked_edges = task
+    blocked = set(blocked_edges)
+    rows = []
+    for station_id, source in enumerate(_context['station_nodes'], 1):
+        covered, etas = _station_search(_graph, source, blocked, _context['demand_nodes'],
+                                        _context['coverage_min'])
+        base_covered, base_etas = _context['baseline'][station_id - 1]
+
+        delays = [eta - base for eta, base in zip(etas, base_etas) if eta is not None and base is not None]
+        lost = sum(1 for eta, base in zip(etas, base_etas) if eta is None and base is not None)
+        rows.append({
+            'pattern': pattern_id,
+            'station': station_id,
+            'blocked_roads': len({road_key(edge) for edge in blocked_edges}),
+            'coverage': covered / len(_graph),
+            'coverage_loss': (base_covered - covered) / len(_graph),
+            'mean_delay_min': sum(delays) / len(delays) if delays else 0.0,
+            'max_delay_min': max(delays, default=0.0),
+            'unreachable': lost
+        })
+    return rows
+
+
+def run_resilience_analysis(graph, patterns, stations=STATIONS, coverage_min=COVERAGE_MIN,
+                            demand_points=DEMAND_POINTS, workers=DEFAULT_WORKERS, seed=0):
+    """Evaluate damage patterns for every station, returning one row per (pattern, station)
+
+    The graph is only read; travel times are computed from edge lengths during the searches.
+    """
+    rng = random.Random(seed)
+    nodes = list(graph.nodes)
+    context = {
+        'station_nodes': [find_nearest_node(graph, lat, lon) for lat, lon, _ in stations],
+        'demand_nodes': rng.sample(nodes, min(demand_points, len(nodes))),
+        'coverage_min': coverage_min
+    }
+    context['baseline'] = [
+        _station_search(graph, source, set(), context['demand_nodes'], coverage_min)
+        for source in context['station_nodes']
+    ]
+
+    print(f"Analyzing {len(patterns)} damage patterns x {len(stations)} stations on {workers} workers...")
+    rows = []
+    tasks = list(enumerate(patterns, 1))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(graph, context)) as pool:
+        for pattern_rows in pool.map(_analyze_pattern, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+            rows.extend(pattern_rows)
+    return rows
+
+
+def rank_critical_roads(patterns, rows):
+    """Roads ranked by mean coverage loss (summed over stations) of patterns closing them
+
+    The score is co-occurrence based: every road in a pattern is credited with
+    the pattern's whole loss, so with multi-road (random) patterns a harmless
+    road closed alongside a critical one ranks as high as it does. Only
+    single-closure patterns give each road its own effect.
+    """
+    pattern_loss = defaultdict(float)
+    for row in rows:
+        pattern_loss[row['pattern']] += row['coverage_loss']
+
+    losses = defaultdict(list)
+    for pattern_id, blocked_edges in enumerate(patterns, 1):
+        for road in {road_key(edge) for edge in blocked_edges}:
+            losses[road].append(pattern_loss[pattern_id])
+
+    ranking = [{'u': u, 'v': v, 'key': key, 'patterns': len(values),
+                'mean_cooccurrence_coverage_loss': sum(values) / len(values)}
+               for (u, v, key), values in losses.items()]
+    return sorted(ranking, key=lambda r: r['mean_cooccurrence_coverage_loss'], reverse=True)
+
+
+def export_table(rows, path):
+    """Write result rows (dicts) as CSV"""
+    if not rows:
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} rows to {path}")
+
+
+def road_heat_points(graph, ranking):
+    """Heat overlay points (lat, lon, weight) at road midpoints"""
+    top = max((r['mean_cooccurrence_coverage_loss'] for r in ranking), default=0)
+    if top <= 0:
+        return []
+    return [((graph.nodes[r['u']]['y'] + graph.nodes[r['v']]['y']) / 2,
+             (graph.nodes[r['u']]['x'] + graph.nodes[r['v']]['x']) / 2,
+             r['mean_cooccurrence_coverage_loss'] / top)
+            for r in ranking if r['mean_cooccurrence_coverage_loss'] > 0]
+
+
+def main():
+    """Analysis entry point: resilience.py [random|single] [PATTERNS] [WORKERS]
+
+    PATTERNS defaults to 100 random patterns, or every major road in single mode.
+    """
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'random'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WORKERS
+
+    graph = load_road_graph()
+    major_edges = get_major_road_edges(graph)
+    if mode == 'single':
+        patterns = single_closure_patterns(graph, major_edges)
+        if count is not None and count < len(patterns):
+            print(f"Closing the first {count} of {len(patterns)} major roads, "
+                  f"{len(patterns) - count} roads are left out of the ranking")
+            patterns = patterns[:count]
+    else:
+        patterns = random_damage_patterns(graph, major_edges, 100 if count is None else count, seed=0)
+
+    rows = run_resilience_analysis(graph, patterns, workers=workers)
+    ranking = rank_critical_roads(patterns, rows)
+    export_table(rows, "resilience_stations.csv")
+    export_table(ranking, "resilience_roads.csv")
+
+    m = create_base_map()
+    add_resilience_heat_to_map(m, road_heat_points(graph, ranking))
+    m.save("resilience_map.html")
+    print("Saved heat overlay to resilience_map.html")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,165 @@
 """Road network graph loading and caching"""
 import os
+import math
 import pickle
+import random
+from collections import OrderedDict
+import networkx as nx
 import osmnx as ox
 
 CACHE_FILE = "road_graph.pkl"
+CITY_PLACE = "Kharkiv, Ukraine"
+REGION_PLACE = "Kharkiv Oblast, Ukraine"
 
+SHARD_DIR = "road_shards"
+SHARD_INDEX_FILE = "index.pkl"
+SHARD_TILE_DEG = 0.1       # ~11 km x 7 km tiles at Kharkiv latitude
+SHARD_MARGIN_DEG = 0.02    # Corridor padding around query points
+MAX_LOADED_SHARDS = 16
 
-def load_road_graph():
-    """Load cached or download road graph for Kharkiv"""
-    if os.path.exists(CACHE_FILE):
+
+def load_road_graph(place=CITY_PLACE, cache_file=CACHE_FILE):
+    """Load cached or download road graph for a place"""
+    if os.path.exists(cache_file):
         print("Loading road graph from cache...")
-        with open(CACHE_FILE, 'rb') as f:
+        with open(cache_file, 'rb') as f:
             return pickle.load(f)
 
-    print("Downloading road graph from OSM...")
-    graph = ox.graph_from_place("Kharkiv, Ukraine", network_type='drive')
+    print(f"Downloading road graph for {place} from OSM...")
+    graph = ox.graph_from_place(place, network_type='drive')
 
-    with open(CACHE_FILE, 'wb') as f:
+    with open(cache_file, 'wb') as f:
         pickle.dump(graph, f)
     print(f"Road graph cached ({len(graph.edges)} edges)")
     return graph
 
 
+def _tile_key(lat, lon, tile_deg=SHARD_TILE_DEG):
+    """Tile (row, col) containing a coordinate"""
+    return math.floor(lat / tile_deg), math.floor(lon / tile_deg)
+
+
+def build_graph_shards(graph, shard_dir=SHARD_DIR, tile_deg=SHARD_TILE_DEG):
+    """Partition a road graph into bbox tiles
+
+    Each edge is stored in the shard of its source node; the target node is
+    copied alongside so shards are self-contained and a search can expand
+    any node once the shard of its own tile is loaded.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    node_tile = {n: _tile_key(d['y'], d['x'], tile_deg) for n, d in graph.nodes(data=True)}
+
+    shards = {}
+    for node, key in node_tile.items():
+        if key not in shards:
+            shards[key] = nx.MultiDiGraph(**graph.graph)
+        shards[key].add_node(node, **graph.nodes[node])
+
+    for u, v, key, data in graph.edges(keys=True, data=True):
+        shard = shards[node_tile[u]]
+        if node_tile[v] != node_tile[u]:
+            shard.add_node(v, **graph.nodes[v])
+        shard.add_edge(u, v, key, **data)
+
+    tiles = {}
+    for (row, col), shard in shards.items():
+        file_name = f"shard_{row}_{col}.pkl"
+        with open(os.path.join(shard_dir, file_name), 'wb') as f:
+            pickle.dump(shard, f)
+        tiles[(row, col)] = {
+            'file': file_name,
+            'bbox': (row * tile_deg, col * tile_deg, (row + 1) * tile_deg, (col + 1) * tile_deg),
+            'edges': len(shard.edges)
+        }
+
+    index = {'tile_deg': tile_deg, 'tiles': tiles}
+    with open(os.path.join(shard_dir, SHARD_INDEX_FILE), 'wb') as f:
+        pickle.dump(index, f)
+    print(f"Road graph split into {len(tiles)} shards")
+    return index
+
+
+class ShardedRoadGraph:
+    """Lazily loaded, tile-sharded road graph with LRU eviction of cold shards
+
+    Loaded shards live in one resident graph (`self.graph`) that is routed
+    on directly, so at most `max_loaded` shards are held in memory at once.
+    Shards marked cold are evicted before least recently used ones.
+    """
+
+    def __init__(self, shard_dir=SHARD_DIR, max_loaded=MAX_LOADED_SHARDS):
+        self.shard_dir = shard_dir
+        self.max_loaded = max_loaded
+        with open(os.path.join(shard_dir, SHARD_INDEX_FILE), 'rb') as f:
+            index = pickle.load(f)
+        self.tile_deg = index['tile_deg']
+        self.tiles = index['tiles']
+        self.graph = nx.MultiDiGraph()
+        self._loaded = OrderedDict()   # tile key -> edges (u, v, key) it added
+
+    def load_shards(self, keys):
+        """Make the given shards resident, evicting cold ones, and return the graph
+
+        Raises ValueError if more than `max_loaded` shards are requested.
+        """
+        keys = set(keys)
+        if len(keys) > self.max_loaded:
+            raise ValueError(f"{len(keys)} shards requested, at most {self.max_loaded} can be loaded")
+
+        for key in sorted(keys):
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                continue
+
+            with open(os.path.join(self.shard_dir, self.tiles[key]['file']), 'rb') as f:
+                shard = pickle.load(f)
+            self.graph.graph.update(shard.graph)
+            self.graph.add_nodes_from(shard.nodes(data=True))
+            self.graph.add_edges_from(shard.edges(keys=True, data=True))
+            self._loaded[key] = list(shard.edges(keys=True))
+
+        for key in [k for k in self._loaded if k not in keys][:max(0, len(self._loaded) - self.max_loaded)]:
+            self._evict(key)
+        return self.graph
+
+    def mark_cold(self, keys):
+        """Move loaded shards to the front of the eviction order"""
+        for key in keys:
+            if key in self._loaded:
+                self._loaded.move_to_end(key, last=False)
+
+    def _evict(self, key):
+        """Drop a shard's edges and any nodes left without edges"""
+        edges = self._loaded.pop(key)
+        self.graph.remove_edges_from(edges)
+        touched = {n for u, v, _ in edges for n in (u, v)}
+        self.graph.remove_nodes_from([n for n in touched if self.graph.degree(n) == 0])
+
+    def shards_for_points(self, points, margin=SHARD_MARGIN_DEG):
+        """Existing tile keys within `margin` of any (lat, lon) point"""
+        keys = set()
+        for lat, lon in points:
+            row_min, col_min = _tile_key(lat - margin, lon - margin, self.tile_deg)
+            row_max, col_max = _tile_key(lat + margin, lon + margin, self.tile_deg)
+            keys |= {(row, col)
+                     for row in range(row_min, row_max + 1)
+                     for col in range(col_min, col_max + 1)
+                     if (row, col) in self.tiles}
+        return keys
+
+    def tile_for_point(self, lat, lon):
+        """Tile key containing a coordinate"""
+        return _tile_key(lat, lon, self.tile_deg)
+
+
+def load_sharded_road_graph(place=REGION_PLACE, shard_dir=SHARD_DIR, max_loaded=MAX_LOADED_SHARDS):
+    """Open sharded region graph, building shards from OSM on first use"""
+    if not os.path.exists(os.path.join(shard_dir, SHARD_INDEX_FILE)):
+        print(f"Downloading road graph for {place} from OSM...")
+        build_graph_shards(ox.graph_from_place(place, network_type='drive'), shard_dir)
+    return ShardedRoadGraph(shard_dir, max_loaded)
+
+
 def get_major_road_edges(graph, center_lat=49.9808, center_lon=36.2527, max_dist=0.015):
     """Get major road edges near city center"""
     major_types = ['motorway', 'motorway_link', 'trunk', 'trunk_link',
@@ -44,6 +182,62 @@ def get_major_road_edges(graph, center_lat=49.9808, center_lon=36.2527, max_dist
     return major_edges
 
 
+def random_impacts(center_lat, center_lon, rng=random, num_impacts=(3, 5), radius=0.02):
+    """Random impact points around a center"""
+    return [(center_lat + rng.uniform(-radius, radius), center_lon + rng.uniform(-radius, radius))
+            for _ in range(rng.randint(*num_impacts))]
+
+
+def damage_roads(graph, major_edges, impacts, rng=random, impact_radius=0.008, roads_per_impact=(2, 4)):
+    """Block the major roads closest to each impact, in both directions
+
+    Returns (blocked_edges, damaged_roads, impact_zones): every blocked edge
+    direction, one edge per destroyed road (for drawing), and per-impact counts.
+    """
+    blocked_edges = []
+    blocked = set()
+    damaged_roads = []
+    impact_zones = []
+
+    for impact_lat, impact_lon in impacts:
+        nearby = []
+        for edge in major_edges:
+            if edge in blocked:
+                continue
+
+            u, v, key = edge
+            mid_lat = (graph.nodes[u]['y'] + graph.nodes[v]['y']) / 2
+            mid_lon = (graph.nodes[u]['x'] + graph.nodes[v]['x']) / 2
+            dist = ((mid_lat - impact_lat)**2 + (mid_lon - impact_lon)**2)**0.5
+
+            if dist <= impact_radius:
+                nearby.append((edge, dist))
+
+        nearby.sort(key=lambda x: x[1])
+        blocked_count = 0
+
+        for edge, _ in nearby[:rng.randint(*roads_per_impact)]:
+            u, v, key = edge
+
+            # Block forward direction
+            if edge not in blocked:
+                blocked.add(edge)
+                blocked_edges.append(edge)
+                damaged_roads.append(edge)
+                blocked_count += 1
+
+            # Block reverse direction (whole road destroyed)
+            reverse_edge = (v, u, key)
+            if graph.has_edge(v, u, key) and reverse_edge not in blocked:
+                blocked.add(reverse_edge)
+                blocked_edges.append(reverse_edge)
+                blocked_count += 1
+
+        impact_zones.append({'lat': impact_lat, 'lon': impact_lon, 'roads_damaged': blocked_count})
+
+    return blocked_edges, damaged_roads, impact_zones
+
+
 def get_edge_geometry(graph, edge):
     """Get coordinates for an edge (uses geometry or node positions)"""
     u, v, key = edge
@@ -54,3 +248,25 @@ def get_edge_geometry(graph, edge):
 
     return [[graph.nodes[u]['y'], graph.nodes[u]['x']],
             [graph.nodes[v]['y'], graph.nodes[v]['x']]]
+
+
+def get_route_geometry(graph, route_path):
+    """Get coordinates along a node path (uses edge geometry where present)"""
+    coords = []
+
+    for i in range(len(route_path) - 1):
+        u, v = route_path[i], route_path[i + 1]
+
+        if graph.has_edge(u, v):
+            edge_data = graph[u][v]
+            edge_key = list(edge_data.keys())[0]
+            edge_info = edge_data[edge_key]
+
+            if 'geometry' in edge_info:
+                coords.extend([(p[1], p[0]) for p in edge_info['geometry'].coords])
+            else:
+                if not coords or coords[-1] != [graph.nodes[u]['y'], graph.nodes[u]['x']]:
+                    coords.append([graph.nodes[u]['y'], graph.nodes[u]['x']])
+                coords.append([graph.nodes[v]['y'], graph.nodes[v]['x']])
+
+    return coords
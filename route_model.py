@@ -0,0 +1,33 @@
+"""Compact route records shared by routing, the routing service and the UI"""
+from array import array
+
+
+class RouteRecord:
+    """Route option with its node path packed into an int64 array
+
+    `key` identifies the route cheaply, so selection checks never compare
+    whole paths.
+    """
+    __slots__ = ('name', 'path', 'distance_km', 'time_min', 'color', 'type', 'key')
+
+    def __init__(self, name, path, distance_km, time_min, color, route_type):
+        self.name = name
+        self.path = array('q', path)
+        self.distance_km = distance_km
+        self.time_min = time_min
+        self.color = color
+        self.type = route_type
+        self.key = (route_type, len(self.path), hash(self.path.tobytes()))
+
+    def __repr__(self):
+        return f"RouteRecord({self.name!r}, {len(self.path)} nodes, {self.time_min:.1f} min)"
+
+    def to_dict(self):
+        """Plain dict for JSON transport"""
+        return {'name': self.name, 'path': self.path.tolist(), 'distance_km': self.distance_km,
+                'time_min': self.time_min, 'color': self.color, 'type': self.type}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data['path'], data['distance_km'], data['time_min'],
+                   data['color'], data['type'])
@@ -0,0 +1,140 @@
+"""Thin client for the routing service with pooled connections"""
+import json
+import queue
+import socket
+from itertools import count
+
+from route_model import RouteRecord
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class RoutingError(Exception):
+    """Error reported by the routing service"""
+
+
+class RoutingClient:
+    """Routing service client, safe to share between threads
+
+    `address` is a (host, port) tuple or a Unix socket path. Up to
+    `pool_size` connections are kept open and reused across calls.
+    `connect_timeout` bounds connecting, `timeout` bounds each request.
+    """
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), pool_size=4, timeout=60, connect_timeout=2):
+        self.address = address
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._pool = queue.LifoQueue(pool_size)
+        self._ids = count(1)
+
+    def _connect(self):
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        try:
+            sock.connect(self.address)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.timeout)
+        return sock, sock.makefile('rwb')
+
+    def _request(self, request):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        sock, stream = conn
+        try:
+            stream.write(json.dumps(request, separators=(',', ':')).encode() + b'\n')
+            stream.flush()
+            line = stream.readline()
+            if not line:
+                raise ConnectionError("Routing service closed the connection")
+        except Exception:
+            stream.close()
+            sock.close()
+            raise
+
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            stream.close()
+            sock.close()
+        return json.loads(line)
+
+    @staticmethod
+    def _result(response):
+        if 'error' in response:
+            raise RoutingError(response['error'])
+        return response['result']
+
+    def call(self, method, **params):
+        """Run one service method and return its result"""
+        return self._result(self._request({'id': next(self._ids), 'method': method, 'params': params}))
+
+    def batch(self, calls):
+        """Run (method, params) calls in parallel on the service
+
+        Returns one entry per call, in order: its result, or a RoutingError
+        if that call failed, so one failure does not discard the rest.
+        """
+        requests = [{'id': next(self._ids), 'method': method, 'params': params} for method, params in calls]
+        responses = self._result(self._request({'id': next(self._ids), 'method': 'batch',
+                                                'params': {'requests': requests}}))
+        return [RoutingError(r['error']) if 'error' in r else r['result'] for r in responses]
+
+    def ping(self):
+        return self.call('ping') == 'pong'
+
+    def find_routes(self, start_lat, start_lon, end_lat, end_lon, blocked_edges=(), departure_min=None,
+                    algorithm='dijkstra'):
+        """Same result as pathfinding.find_routes, computed by the service"""
+        routes = self.call('find_routes', start_lat=start_lat, start_lon=start_lon,
+                           end_lat=end_lat, end_lon=end_lon, blocked_edges=list(blocked_edges),
+                           departure_min=departure_min, algorithm=algorithm)
+        return [RouteRecord.from_dict(route) for route in routes]
+
+    def rank_stations(self, stations, lat, lon, blocked_edges=(), departure_min=None, algorithm='dijkstra'):
+        """Same result as pathfinding.rank_stations, computed by the service"""
+        return self.call('rank_stations', stations=list(stations), lat=lat, lon=lon,
+                         blocked_edges=list(blocked_edges), departure_min=departure_min,
+                         algorithm=algorithm)
+
+    def route_geometry(self, paths):
+        """Drawing coordinates of each node path, as road_network.get_route_geometry"""
+        return self.call('route_geometry', paths=[list(path) for path in paths])
+
+    def damage_roads(self, impacts):
+        """Block major roads near impact points on the service's graph
+
+        Returns (blocked_edges, damaged_roads_coords, impact_zones), like
+        road_network.damage_roads but with drawing coordinates of the
+        destroyed roads instead of their edges.
+        """
+        result = self.call('damage_roads', impacts=list(impacts))
+        return ([tuple(edge) for edge in result['blocked_edges']], result['damaged_roads_coords'],
+                result['impact_zones'])
+
+    def close(self):
+        """Close all pooled connections"""
+        while True:
+            try:
+                sock, stream = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            stream.close()
+            sock.close()
+
+
+def connect_routing_service(address=(DEFAULT_HOST, DEFAULT_PORT), timeout=60, connect_timeout=2):
+    """Client for a running routing service, or None if none is reachable"""
+    client = RoutingClient(address, timeout=timeout, connect_timeout=connect_timeout)
+    try:
+        client.ping()
+    except OSError:
+        return None
+    return client
@@ -0,0 +1,143 @@
+"""Routing daemon keeping the road graph resident for multiple clients
+
+Protocol: one JSON object per line in each direction.
+Request:  {"id": 1, "method": "find_routes", "params": {...}}
+Response: {"id": 1, "result": ...} or {"id": 1, "error": "..."}
+A "batch" request carries {"requests": [...]} and gets a list of responses.
+
+Requests run on a thread pool over one shared, read-only graph, so the
+service holds a single copy of the graph whatever the worker count. Routing
+is pure Python, so workers mostly overlap I/O and waiting clients rather
+than adding CPU parallelism.
+"""
+import os
+import sys
+import json
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+
+from road_network import load_road_graph, get_major_road_edges, damage_roads, get_edge_geometry, get_route_geometry
+from speed_profiles import load_speed_profiles
+from pathfinding import NearestNodeIndex, find_routes, rank_stations
+from routing_client import DEFAULT_HOST, DEFAULT_PORT
+
+DEFAULT_WORKERS = 4
+
+# Graph, profiles and indexes shared by all worker threads (set by serve)
+_graph = None
+_profiles = None
+_node_index = None
+_major_edges = None
+
+
+def _handle_call(method, params):
+    """Dispatch one request to the routing functions"""
+    blocked_edges = [tuple(edge) for edge in params.get('blocked_edges', [])]
+    departure_min = params.get('departure_min')
+    profiles = _profiles if departure_min is not None else None
+    algorithm = params.get('algorithm', 'dijkstra')
+
+    if method == 'find_routes':
+        routes = find_routes(_graph, params['start_lat'], params['start_lon'],
+                             params['end_lat'], params['end_lon'], blocked_edges,
+                             profiles, departure_min, algorithm, node_index=_node_index)
+        return [route.to_dict() for route in routes]
+    if method == 'rank_stations':
+        stations = [tuple(station) for station in params['stations']]
+        return rank_stations(_graph, stations, params['lat'], params['lon'], blocked_edges,
+                             profiles, departure_min, algorithm, node_index=_node_index)
+    if method == 'route_geometry':
+        return [get_route_geometry(_graph, path) for path in params['paths']]
+    if method == 'damage_roads':
+        impacts = [tuple(impact) for impact in params['impacts']]
+        blocked, damaged, impact_zones = damage_roads(_graph, _major_edges, impacts)
+        return {'blocked_edges': blocked, 'impact_zones': impact_zones,
+                'damaged_roads_coords': [get_edge_geometry(_graph, edge) for edge in damaged]}
+    if method == 'ping':
+        return 'pong'
+    raise ValueError(f"Unknown method: {method}")
+
+
+def _run_call(request):
+    """Run a request, turning failures into error responses"""
+    try:
+        return {'id': request.get('id'), 'result': _handle_call(request['method'], request.get('params', {}))}
+    except Exception as e:
+        return {'id': request.get('id'), 'error': f"{type(e).__name__}: {e}"}
+
+
+class RoutingRequestHandler(socketserver.StreamRequestHandler):
+    """Serve newline-delimited JSON requests on one client connection"""
+
+    def handle(self):
+        pool = self.server.pool
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {'id': None, 'error': f"Bad request: {e}"}
+            else:
+                if request.get('method') == 'batch':
+                    futures = [pool.submit(_run_call, r) for r in request.get('params', {}).get('requests', [])]
+                    response = {'id': request.get('id'), 'result': [f.result() for f in futures]}
+                else:
+                    response = pool.submit(_run_call, request).result()
+
+            self.wfile.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+            self.wfile.flush()
+
+
+class RoutingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class RoutingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, workers=DEFAULT_WORKERS):
+    """Load the graph and its indexes once and serve routing requests until interrupted"""
+    global _graph, _profiles, _node_index, _major_edges
+    _graph = load_road_graph()
+    _profiles = load_speed_profiles(_graph)
+    _node_index = NearestNodeIndex(_graph)
+    _major_edges = get_major_road_edges(_graph)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = RoutingUnixServer(socket_path, RoutingRequestHandler)
+        address = socket_path
+    else:
+        server = RoutingTCPServer((host, port), RoutingRequestHandler)
+        address = f"{host}:{port}"
+
+    with ThreadPoolExecutor(workers) as pool:
+        server.pool = pool
+        print(f"Routing service on {address} ({workers} workers, {len(_graph.edges)} edges)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if socket_path and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+def main():
+    """Service entry point: routing_service.py [PORT | UNIX_SOCKET_PATH] [WORKERS]"""
+    target = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_PORT)
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WORKERS
+    if target.isdigit():
+        serve(port=int(target), workers=workers)
+    else:
+        serve(socket_path=target, workers=workers)
+
+
+if __name__ == '__main__':
+    main()
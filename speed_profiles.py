@@ -0,0 +1,129 @@
+"""Time-of-day edge speed profiles in compact quantized storage"""
+import os
+import pickle
+import hashlib
+from array import array
+
+PROFILES_FILE = "speed_profiles.pkl"
+BIN_MINUTES = 15
+NUM_BINS = 24 * 60 // BIN_MINUTES   # 96 bins per day
+SPEED_QUANTUM_KMH = 0.5              # 1 byte per bin covers 0-127.5 km/h
+MAX_SPEED_KMH = 255 * SPEED_QUANTUM_KMH
+
+MAJOR_HIGHWAYS = ['motorway', 'trunk', 'primary']
+MAJOR_SPEED_KMH = 80
+MINOR_SPEED_KMH = 60
+
+# (start_min, end_min, major road factor, minor road factor)
+RUSH_HOURS = [
+    (7 * 60 + 30, 9 * 60 + 30, 0.45, 0.7),
+    (17 * 60, 19 * 60 + 30, 0.5, 0.7),
+]
+
+
+def static_speed_kmh(edge_data):
+    """Free-flow speed: 80 km/h for highways, 60 km/h for others"""
+    return MAJOR_SPEED_KMH if edge_data.get('highway', '') in MAJOR_HIGHWAYS else MINOR_SPEED_KMH
+
+
+def time_bin(minute_of_day):
+    """Profile bin index for minutes since midnight (wraps past midnight)"""
+    return int(minute_of_day // BIN_MINUTES) % NUM_BINS
+
+
+def _quantize(speed_kmh):
+    return max(1, min(255, round(speed_kmh / SPEED_QUANTUM_KMH)))
+
+
+def graph_fingerprint(graph):
+    """Edge count plus a hash of edge keys in iteration order"""
+    digest = hashlib.sha1()
+    for u, v, key in graph.edges(keys=True):
+        digest.update(f"{u},{v},{key};".encode())
+    return len(graph.edges), digest.hexdigest()
+
+
+class SpeedProfiles:
+    """Per-edge speed for each 15-minute bin, one byte per edge per bin
+
+    Rows follow the graph's edge iteration order; `attach` stores each
+    edge's row as its 'profile_row' attribute, so no per-edge index is kept.
+    """
+
+    def __init__(self, graph):
+        self.fingerprint = graph_fingerprint(graph)
+        self.speeds = array('B', bytes(self.fingerprint[0] * NUM_BINS))
+        self._max_speed = None
+        self.attach(graph)
+
+    def attach(self, graph):
+        """Number graph edges with their profile rows (graph must match the profiles)"""
+        if graph_fingerprint(graph) != self.fingerprint:
+            raise ValueError("Speed profiles were built for a different graph")
+        for row, (_, _, data) in enumerate(graph.edges(data=True)):
+            data['profile_row'] = row
+
+    def set_profile(self, edge_data, speeds_kmh):
+        """Store NUM_BINS speeds (km/h) for an attached edge"""
+        self._max_speed = None
+        offset = edge_data['profile_row'] * NUM_BINS
+        for i, speed in enumerate(speeds_kmh):
+            self.speeds[offset + i] = _quantize(speed)
+
+    def speed_kmh(self, edge_data, minute_of_day):
+        """Speed on an attached edge at a time of day"""
+        return self.speeds[edge_data['profile_row'] * NUM_BINS + time_bin(minute_of_day)] * SPEED_QUANTUM_KMH
+
+    def max_speed_kmh(self):
+        """Fastest speed over all edges and bins (bound for A* heuristics)"""
+        if self._max_speed is None:
+            self._max_speed = max(self.speeds, default=_quantize(MAX_SPEED_KMH)) * SPEED_QUANTUM_KMH
+        return self._max_speed
+
+    def nbytes(self):
+        return self.speeds.itemsize * len(self.speeds)
+
+
+def default_profile(edge_data):
+    """Free-flow speed with rush-hour slowdowns by road class"""
+    free_flow = static_speed_kmh(edge_data)
+    is_major = edge_data.get('highway', '') in MAJOR_HIGHWAYS
+    speeds = []
+    for b in range(NUM_BINS):
+        minute = b * BIN_MINUTES
+        factor = 1.0
+        for start, end, major_factor, minor_factor in RUSH_HOURS:
+            if start <= minute < end:
+                factor = major_factor if is_major else minor_factor
+        speeds.append(free_flow * factor)
+    return speeds
+
+
+def build_speed_profiles(graph, profile_fn=default_profile):
+    """Create profiles for every graph edge from a per-edge profile function"""
+    profiles = SpeedProfiles(graph)
+    for _, _, data in graph.edges(data=True):
+        profiles.set_profile(data, profile_fn(data))
+    print(f"Speed profiles built ({profiles.fingerprint[0]} edges, {profiles.nbytes() // 1024} KiB)")
+    return profiles
+
+
+def load_speed_profiles(graph, profiles_file=PROFILES_FILE):
+    """Load cached or build speed profiles for a graph
+
+    The cache is rebuilt when it was made for a different graph. Edges of
+    `graph` get a 'profile_row' attribute either way.
+    """
+    if os.path.exists(profiles_file):
+        print("Loading speed profiles from cache...")
+        with open(profiles_file, 'rb') as f:
+            profiles = pickle.load(f)
+        if profiles.fingerprint == graph_fingerprint(graph):
+            profiles.attach(graph)
+            return profiles
+        print("Speed profile cache does not match road graph, rebuilding...")
+
+    profiles = build_speed_profiles(graph)
+    with open(profiles_file, 'wb') as f:
+        pickle.dump(profiles, f)
+    return profiles
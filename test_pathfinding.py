@@ -0,0 +1,135 @@
+"""Bidirectional A* against networkx Dijkstra on a small synthetic road graph"""
+import random
+
+import networkx as nx
+import pytest
+
+from pathfinding import (
+    ALGORITHMS, NearestNodeIndex, bidirectional_astar_path, haversine_m, find_nearest_node, find_routes,
+    find_routes_sharded, _time_cost
+)
+from road_network import build_graph_shards, ShardedRoadGraph
+
+
+def synthetic_road_graph(seed=0, size=8, step=(0.004, 0.006)):
+    """Grid of nodes near Kharkiv with jittered coordinates and parallel edges
+
+    Edge lengths are at least the straight-line distance, as on real roads.
+    """
+    rng = random.Random(seed)
+    graph = nx.MultiDiGraph(crs='epsg:4326')
+    for row in range(size):
+        for col in range(size):
+            graph.add_node(row * size + col, y=49.95 + row * step[0] + rng.uniform(-0.001, 0.001),
+                           x=36.20 + col * step[1] + rng.uniform(-0.001, 0.001))
+
+    highways = ['primary', 'secondary', 'residential']
+    for row in range(size):
+        for col in range(size):
+            u = row * size + col
+            for v in (u + 1 if col < size - 1 else None, u + size if row < size - 1 else None):
+                if v is None:
+                    continue
+                for _ in range(rng.choice([1, 1, 2])):
+                    length = haversine_m(graph, u, v) * rng.uniform(1.0, 1.6)
+                    highway = rng.choice(highways)
+                    graph.add_edge(u, v, length=length, highway=highway)
+                    if rng.random() < 0.9:
+                        graph.add_edge(v, u, length=length, highway=highway)
+    return graph
+
+
+def closed_mask(graph, seed=0, share=0.15):
+    rng = random.Random(seed)
+    return {edge for edge in graph.edges(keys=True) if rng.random() < share}
+
+
+def dijkstra_cost(graph, source, target, edge_cost, closed):
+    def weight(u, v, edges):
+        costs = [edge_cost(data) for key, data in edges.items() if (u, v, key) not in closed]
+        return min(costs) if costs else None
+    return nx.shortest_path_length(graph, source, target, weight=weight)
+
+
+def path_cost(graph, path, edge_cost, closed):
+    return sum(min(edge_cost(data) for key, data in graph[u][v].items() if (u, v, key) not in closed)
+               for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize('weight, edge_cost', [('length', lambda data: data['length']), ('time', _time_cost)])
+def test_bidirectional_astar_matches_dijkstra(weight, edge_cost):
+    graph = synthetic_road_graph()
+    closed = closed_mask(graph)
+    rng = random.Random(1)
+    nodes = list(graph.nodes)
+
+    for _ in range(100):
+        source, target = rng.sample(nodes, 2)
+        try:
+            expected = dijkstra_cost(graph, source, target, edge_cost, closed)
+        except nx.NetworkXNoPath:
+            with pytest.raises(nx.NetworkXNoPath):
+                bidirectional_astar_path(graph, source, target, weight, closed)
+            continue
+
+        stats = {}
+        path = bidirectional_astar_path(graph, source, target, weight, closed, stats)
+        assert path[0] == source and path[-1] == target
+        assert stats['cost'] == pytest.approx(expected)
+        assert path_cost(graph, path, edge_cost, closed) == pytest.approx(expected)
+
+
+def test_bidirectional_astar_unreachable_raises():
+    graph = synthetic_road_graph()
+    graph.add_node('island', y=49.99, x=36.30)
+    with pytest.raises(nx.NetworkXNoPath):
+        bidirectional_astar_path(graph, 0, 'island')
+
+    # Closing every edge into the target cuts it off as well
+    closed = {(u, v, key) for u, v, key in graph.in_edges(5, keys=True)}
+    with pytest.raises(nx.NetworkXNoPath):
+        bidirectional_astar_path(graph, 0, 5, closed=closed)
+
+
+def test_find_routes_rejects_unknown_algorithm():
+    assert 'bidirectional_astar' in ALGORITHMS
+    with pytest.raises(ValueError):
+        find_routes(synthetic_road_graph(), 49.95, 36.20, 49.97, 36.22, [], algorithm='astar')
+
+
+def test_find_routes_rejects_astar_with_departure_time():
+    with pytest.raises(ValueError):
+        find_routes(synthetic_road_graph(), 49.95, 36.20, 49.97, 36.22, [], profiles=object(),
+                    departure_min=8 * 60, algorithm='bidirectional_astar')
+
+
+@pytest.fixture
+def sharded_region(tmp_path):
+    """0.4 x 0.4 degree grid split into 0.1 degree tiles, at most 4 loaded"""
+    graph = synthetic_road_graph(seed=3, size=20, step=(0.02, 0.02))
+    build_graph_shards(graph, str(tmp_path), tile_deg=0.1)
+    return graph, ShardedRoadGraph(str(tmp_path), max_loaded=4)
+
+
+@pytest.mark.parametrize('start, end', [
+    ((49.97, 36.22), (49.99, 36.26)),   # within a few tiles: fastest and alternative route
+    ((49.96, 36.21), (50.31, 36.57)),   # diagonal across more tiles than can be loaded
+])
+def test_sharded_routes_match_full_graph(sharded_region, start, end):
+    graph, region = sharded_region
+    expected = nx.shortest_path_length(graph, find_nearest_node(graph, *start),
+                                       find_nearest_node(graph, *end), weight='length')
+
+    routes, route_graph = find_routes_sharded(region, *start, *end, [])
+    assert routes[0].distance_km == pytest.approx(expected / 1000)
+    assert len(region._loaded) <= region.max_loaded
+    assert all(route_graph.has_edge(u, v) for u, v in zip(routes[0].path, routes[0].path[1:]))
+
+
+def test_nearest_node_index_matches_osmnx():
+    graph = synthetic_road_graph(size=20)
+    index = NearestNodeIndex(graph)
+    rng = random.Random(4)
+    for _ in range(50):
+        lat, lon = 49.95 + rng.uniform(0, 0.08), 36.20 + rng.uniform(0, 0.12)
+        assert find_nearest_node(graph, lat, lon, index) == find_nearest_node(graph, lat, lon)